@@ -11,15 +11,28 @@ Usage:
 Example:
     python indent_html_data.py ecoucounter_example.html
 
+For large files, the module can be compiled to a native extension with mypyc
+(``mypyc indent_html_data.py``); the compiled module is picked up by the same
+import and the pure Python version remains the fallback.
+
 Author: Generated for HTML formatting
 Date: 2025-12-01
 """
 
-import re
+import io
 import sys
 from pathlib import Path
 
 
+# Void elements of the HTML spec: they never have content, hence no closing tag
+_VOID_TAGS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'source', 'track', 'wbr',
+})
+# Indentation prefixes, precomputed for the usual nesting depths
+_INDENTS = tuple('  ' * depth for depth in range(64))
+
+
 def format_html(html: str) -> str:
     """
     Format HTML content with proper indentation.
@@ -50,36 +63,65 @@ def format_html(html: str) -> str:
       </body>
     </html>
     """
-    # Add newlines after tags
-    html = re.sub(r'>([^<\s])', r'>\n\1', html)
-    html = re.sub(r'(<[^/>][^>]*>)', r'\1\n', html)
-    html = re.sub(r'(</[^>]+>)', r'\1\n', html)
-    
-    # Add indentation
-    lines = html.split('\n')
-    formatted = []
-    indent = 0
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        
+    # Walk the string once, emitting each tag and each text run on its own line
+    buf = io.StringIO()
+    write = buf.write
+    indent: int = 0
+    prefix: str = ''
+    i: int = 0
+    n: int = len(html)
+
+    while i < n:
+        tag_start: int = html.find('<', i)
+        if tag_start == -1:
+            tag_start = n
+        # Text between tags (may itself span several lines)
+        if tag_start > i:
+            for line in html[i:tag_start].split('\n'):
+                line = line.strip()
+                if line:
+                    write(prefix)
+                    write(line)
+                    write('\n')
+        if tag_start == n:
+            break
+        tag_end: int = html.find('>', tag_start)
+        if tag_end == -1:
+            # Unterminated tag: keep the remainder as plain text
+            write(prefix)
+            write(html[tag_start:].strip())
+            write('\n')
+            break
+        tag = html[tag_start:tag_end + 1]
+        i = tag_end + 1
+
+        second = html[tag_start + 1] if tag_start + 1 < n else ''
         # Decrease indent for closing tags
-        if line.startswith('</'):
+        if second == '/':
             indent = max(0, indent - 1)
-        
+            prefix = _INDENTS[indent] if indent < 64 else '  ' * indent
+            write(prefix)
+            write(tag)
+            write('\n')
+            continue
+
         # Add indented line
-        formatted.append('  ' * indent + line)
-        
-        # Increase indent for opening tags (but not self-closing or closing tags)
-        if line.startswith('<') and not line.startswith('</') and not line.endswith('/>') and not line.startswith('<!'):
-            # Check if it's not a self-closing tag
-            tag_name = line.split()[0].replace('<', '').replace('>', '')
-            if tag_name.lower() not in ['meta', 'link', 'img', 'br', 'hr', 'input']:
-                indent += 1
-    
-    return '\n'.join(formatted)
+        write(prefix)
+        write(tag)
+        write('\n')
+
+        # Increase indent for opening tags (but not self-closing or declarations)
+        if second == '!' or html[tag_end - 1] == '/':
+            continue
+        name_end: int = tag_start + 1
+        while name_end < tag_end and html[name_end] not in ' \t\r\n/':
+            name_end += 1
+        tag_name = html[tag_start + 1:name_end]
+        if tag_name.lower() not in _VOID_TAGS:
+            indent += 1
+            prefix = _INDENTS[indent] if indent < 64 else '  ' * indent
+
+    return buf.getvalue().rstrip('\n')
 
 
 def indent_html_file(filepath: str) -> None:
@@ -1,10 +1,36 @@
+import functools
 import logging
 import re
 import json
 import requests
 from typing import Dict, Optional
 import pandas as pd
-from bs4 import BeautifulSoup
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is an optional, faster JSON parser
+    _json_loads = json.loads
+
+# Payload pushed by NextJS: self.__next_f.push([1,"..."])
+# The string is matched as runs of plain characters separated by escapes
+# (unrolled loop), so that escaped quotes are skipped without backtracking.
+_NEXT_F_RE = re.compile(r'self\.__next_f\.push\(\[1,"([^"\\]*(?:\\.[^"\\]*)*)"\]\)', re.DOTALL)
+# Site metadata embedded (escaped) in the NextJS payload. String values are
+# matched with explicit character classes: plain characters, single escapes
+# of the pushed string (e.g. \\u0026 for &) or doubly escaped sequences
+# (\\\\x), none of which can be confused with the closing \\".
+_META_RE = re.compile(r'\\"currentSite\\":{\\"id\\":(?P<site_id>\d+),'
+                      r'\\"name\\":\\"(?P<site_name>(?:[^"\\]|\\[^"\\]|\\\\(?:\\[\\"]|[^"\\]))*)\\",'
+                      r'\\"location\\":{\\"lat\\":(?P<lat>-?[\d.]+),'
+                      r'\\"lon\\":(?P<lon>-?[\d.]+)},'
+                      r'\\"firstData\\":\\"(?P<first_data>[^"\\]*)\\",')
+# Escaped backslash or double quote inside the pushed string
+_UNESCAPE_RE = re.compile(r'\\\\|\\"')
+_UNESCAPE_MAP = {'\\\\': '\\', '\\"': '"'}
+# Trailing UTC offset of an ISO 8601 timestamp
+_UTC_OFFSET_RE = re.compile(r'(?:Z|[+-]\d{2}:?\d{2})$')
+_JSON_DECODER = json.JSONDecoder()
+# Largest remainder of a page read after the payload to keep the connection alive
+_MAX_DRAIN_CHARS = 256 * 1024
 
 class EcoCounterScraper(object):
     """A simple scraper for Eco-Counter display map data.
@@ -40,6 +66,12 @@ class EcoCounterScraper(object):
         "M": "P1M",    # Month
         "Y": "P1Y",    # Year
     }
+    _freq_to_offset = {
+        "D": pd.offsets.Day(),
+        "W": pd.offsets.Week(weekday=6),
+        "M": pd.offsets.MonthEnd(),
+        "Y": pd.offsets.YearEnd(),
+    }
 
     def __init__(self, site_id, debug=False):
         """Initialize the scraper with an optional site identifier.
@@ -55,6 +87,14 @@ class EcoCounterScraper(object):
         self.logger = logging.getLogger(f"{self.__class__.__name__}.site_{site_id}")
         self.is_initialized = False
         self.debug = debug
+        # Reuse connections (TCP + TLS) across requests
+        self._session = requests.Session()
+        self._session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+        # Per-instance cache of scraped structures, keyed on hashable arguments
+        self._scrape_cached = functools.lru_cache(maxsize=64)(
+            self._scrape_count_structure_cached)
 
     def __repr__(self):
         s_repr= (
@@ -111,6 +151,8 @@ class EcoCounterScraper(object):
             If site_id is not provided either in argument or at initialization.
         ValueError: 
             If dates are invalid or frequency not supported
+        ValueError:
+            If no count data is found in the fetched page
         requests.RequestException: If HTTP request fails
 
         Notes
@@ -121,7 +163,10 @@ class EcoCounterScraper(object):
            split the requests into multiple calls. This is due to a limitation of
            the Eco-Counter API which prevents retrieving more than one year of daily
            data in a single request.
-        3. Call the internal method to scrape the data.
+        3. Call the internal method to scrape the data. Results for periods
+           ending before today are cached per instance, so repeating such a
+           request does not hit the website again (see :py:meth:`clear_cache`).
+           Periods reaching today are always fetched, as their counts still grow.
         4. Extract and combine global and directional counts into a single DataFrame.
            This step initializes the scraper as a side effect if it hasn't been done yet.
 
@@ -132,7 +177,13 @@ class EcoCounterScraper(object):
 
         """
         end = pd.Timestamp(end) if end is not None else pd.Timestamp.now(tz=None).normalize()
-        start = pd.Timestamp(start) if start is not None else end - pd.tseries.frequencies.to_offset(freq)
+        if start is not None:
+            start = pd.Timestamp(start)
+        else:
+            try:
+                start = end - self._freq_to_offset[freq]
+            except KeyError:
+                raise ValueError(f"Unsupported frequency '{freq}'. Use one of {list(self.freq_to_granularity_api.keys())}")
         if start.tzinfo is not None:
             start = start.tz_convert(None)
         if end.tzinfo is not None:
@@ -157,12 +208,21 @@ class EcoCounterScraper(object):
             data = pd.concat(all_data)
             return data
         # Scrape the data
-        json_like_data = self._scrape_count_structure(
-            self.site_id,
-            start,
-            end,
-            freq,
-        )
+        if end.normalize() >= pd.Timestamp.now(tz=None).normalize():
+            # Counts of the current day are still growing: do not cache them
+            json_like_data = self._scrape_count_structure(
+                self.site_id,
+                start,
+                end,
+                freq,
+            )
+        else:
+            json_like_data = self._scrape_cached(
+                self.site_id,
+                start.isoformat(),
+                end.isoformat(),
+                freq,
+            )
         if self.debug:
             self.scraped_json_data_ = json_like_data
         # Extract and combine global and directional counts
@@ -202,7 +262,51 @@ class EcoCounterScraper(object):
         end = pd.Timestamp.now(tz=None).normalize()
         return self.fetch_counts(start=start, end=end, freq=freq)
 
+    def clear_cache(self):
+        """Forget the count data cached by previous calls to `fetch_counts`."""
+        self._scrape_cached.cache_clear()
+
+    def close(self):
+        """Close the HTTP session used to fetch the pages."""
+        self._session.close()
+
     #========================================================
+    def _scrape_count_structure_cached(
+        self,
+        site_id,
+        start_iso,
+        end_iso,
+        freq="D",
+    ):
+        """Return dict with count data, taking hashable arguments only.
+
+        This is the function wrapped by the per-instance cache
+        ``self._scrape_cached`` created at initialization. Failures raise,
+        so that only successfully extracted data is cached.
+
+        Parameters
+        ---------
+        site_id: int or str
+            Eco-Counter site identifier.
+        start_iso: str
+            Beginning (included) of the requested period, in ISO format.
+        end_iso: str
+            End of the requested period (included), in ISO format.
+        freq: 
+            Frequency/granularity ('D'=daily, 'W'=weekly, 'M'=monthly, 'Y'=yearly)
+
+        Returns
+        -------
+        dict :
+            See :py:meth:`_scrape_count_structure`.
+        """
+        return self._scrape_count_structure(
+            site_id,
+            pd.Timestamp(start_iso),
+            pd.Timestamp(end_iso),
+            freq,
+        )
+
     def _scrape_count_structure(
         self,
         site_id,
@@ -217,9 +321,9 @@ class EcoCounterScraper(object):
         site_id: int or str
             Eco-Counter site identifier.
             E.g. "300037212" for Cagnes sur Mer (FR)
-        start: pd.Timestamp or alike
+        start: pd.Timestamp
             Beginning (included) of the requested period.
-        end: pd.Timestamp or alike
+        end: pd.Timestamp
             End of the requested period (included).
         freq: 
             Frequency/granularity ('D'=daily, 'W'=weekly, 'M'=monthly, 'Y'=yearly)
@@ -232,6 +336,7 @@ class EcoCounterScraper(object):
         Raises
         ------
         ValueError: If dates are invalid or frequency not supported
+        ValueError: If no count data is found in the fetched page
         requests.RequestException: If HTTP request fails
 
         Notes
@@ -251,9 +356,7 @@ class EcoCounterScraper(object):
         
         """
         # Validate dates
-        start_date = pd.Timestamp(start)
-        end_date = pd.Timestamp(end)
-        if start_date >= end_date:
+        if start >= end:
             raise ValueError(f"Start date ({start}) must be before end date ({end})")
         try:
             granularity = self.freq_to_granularity_api[freq]
@@ -263,19 +366,19 @@ class EcoCounterScraper(object):
         url = self._build_url(
             site_id, 
             granularity=granularity,
-            start=start_date.date().isoformat(),
-            end=end_date.date().isoformat(),
+            start=start.date().isoformat(),
+            end=end.date().isoformat(),
             )
         self.logger.debug(f"Fetching data from: {url}")
-        # Fetch HTML
-        html_data = self._fetch_html(url)
+        # Fetch HTML and extract data while it is downloaded
+        html_data, result = self._fetch_nextjs_data(url, metadata=not self.is_initialized)
         if self.debug:
             self.fetched_html_ = html_data
         self.logger.debug(f"Downloaded {len(html_data)} bytes")
-        self.logger.debug("Extracting data...")
-        result = self._extract_nextjs_data(html_data)
+        if not result:
+            # Raising also keeps the failure out of the per-instance cache
+            raise ValueError(f"No count data found in the page fetched from {url}")
         if not self.is_initialized:
-            self._site_metadata(html_data)
             self._set_direction_names(result)
             self.is_initialized = True
         return result
@@ -318,116 +421,188 @@ class EcoCounterScraper(object):
             url += f"&endDate={end}"
         return url
 
-    def _fetch_html(self, url: str) -> str:
-        """Return the HTML content fetched from a URL.
+    def _fetch_nextjs_data(self, url: str, metadata=False):
+        """Return the HTML content fetched from a URL and the data extracted from it.
         
         Parameters
         ----------
         url: The URL to fetch
+        metadata : bool, default=False
+            If True, the site metadata is extracted as well, and the associated
+            attributes are set (see :py:meth:`_site_metadata`).
             
         Returns
         -------
         str: HTML content as string
+        dict: The extracted data dictionary (empty if not found),
+            see :py:meth:`_extract_nextjs_data`.
             
         Raises
         ------
         requests.RequestException: If the request fails
+        ValueError: If ``metadata`` is True and no site metadata is found.
             
         Examples
         --------
-        >>> html = fetch_html("https://eco-display-map.eco-counter.com/site/300037212")
+        >>> html, data = fetch_nextjs_data("https://eco-display-map.eco-counter.com/site/300037212")
         >>> print(len(html))
         500000  # approximate
 
-        """
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()  # Raise error if request failed
-        return response.text
+        Notes
+        -----
+        The response is streamed and each ``__next_f.push`` block is parsed
+        (see :py:meth:`_parse_push`) as soon as it has been fully received,
+        so that the page is scanned and the payload decoded only once.
+        The download stops once the data (and the site metadata, if requested)
+        has been found. The rest of the page is still read if it is
+        shorter than ``_MAX_DRAIN_CHARS``, so that the session connection can
+        be reused (pushes sit at the end of ``<body>``, so this is the usual
+        case); a longer remainder is skipped by closing the connection.
+        The returned HTML may therefore be truncated.
 
-    def _extract_nextjs_data(self, html_data: str) -> Optional[Dict]:
+        """
+        self.logger.debug("Downloading and extracting embedded count data...")
+        with self._session.get(url, timeout=30, stream=True) as response:
+            response.raise_for_status()  # Raise error if request failed
+            if response.encoding is None:
+                response.encoding = 'utf-8'
+            html_data = ''
+            data = {}
+            scan_pos = 0
+            drain_left = None
+            for chunk in response.iter_content(chunk_size=64 * 1024, decode_unicode=True):
+                html_data += chunk
+                if drain_left is not None:
+                    drain_left -= len(chunk)
+                    if drain_left < 0:
+                        break
+                    continue
+                # Parse each push([1,"..."]) call completed since the last chunk
+                for match in _NEXT_F_RE.finditer(html_data, scan_pos):
+                    scan_pos = match.end()
+                    data, metadata = self._parse_push(match.group(1), data, metadata)
+                if data and not metadata:
+                    # Read the rest of the body if it is small, so that the
+                    # connection goes back to the session pool instead of
+                    # being closed (which costs a new handshake next time)
+                    drain_left = _MAX_DRAIN_CHARS
+        if metadata:
+            raise ValueError("Site metadata not found in the fetched page")
+        return html_data, data
+
+    def _extract_nextjs_data(self, html_data: str, metadata=False) -> Optional[Dict]:
         """Return the json-like part of the page containing the data of interest as a dict.
         
         Parameters
         ----------
         html_data : str
             The HTML content fetched from the Eco-Counter display map site.
+        metadata : bool, default=False
+            If True, the site metadata is looked for in the same pass over
+            the pushed payloads, and the associated attributes are set
+            (see :py:meth:`_site_metadata`).
             
         Returns
         -------
         dict or None
             The extracted data dictionary.
 
+        Raises
+        ------
+        ValueError
+            If ``metadata`` is True and no site metadata is found in the page.
+
         Notes
         -----
         This function was written specifically to parse the Eco-Counter
         display map pages, which embed data in a specific JavaScript format.
         It may break at any time if the website structure changes.
 
+        Pages are parsed while they are downloaded by
+        :py:meth:`_fetch_nextjs_data`; this function parses HTML content
+        already in memory (e.g. ``self.fetched_html_``).
+
         """
         self.logger.debug("Parsing HTML to extract embedded count data...")
-        soup = BeautifulSoup(html_data, 'html.parser')
-        # Find all script tags
-        for script in soup.find_all('script'):
-            script_content = script.string
-            if not script_content:
-                continue
-            # Look for the __next_f.push pattern
-            if 'self.__next_f.push' in script_content and 'chartData' in script_content:
-                # Extract the data between the push() call
-                # Pattern: self.__next_f.push([1,"..."])
-                match = re.search(r'self\.__next_f\.push\(\[1,"(.+?)"\]\)', script_content, re.DOTALL)
-                if match:
-                    # Get the escaped JSON string
-                    escaped_json = match.group(1)
-                    # Unescape it
-                    # Replace \\" with " and \\\\ with \\
-                    unescaped = escaped_json.replace('\\\\', '\x00')  # Temporary placeholder
-                    unescaped = unescaped.replace('\\"', '"')
-                    unescaped = unescaped.replace('\x00', '\\')  # Restore backslashes
-                    # Find the JSON object containing chartData
-                    # Look for the pattern: {"params":... ,"chartData":[...], ...}
-                    # We need to extract from the first { to its matching }
-                    # Find where chartData object starts
-                    chart_start = unescaped.find('"chartData"')
-                    if chart_start == -1:
-                        continue
-                    # Go backwards to find the opening brace of the parent object
-                    brace_pos = chart_start
-                    while brace_pos > 0:
-                        if unescaped[brace_pos] == '{':
-                            # Check if this is the right level
-                            # by counting if it contains the key structure we expect
-                            break
-                        brace_pos -= 1
-                    # Now find the matching closing brace
-                    brace_count = 0
-                    start_pos = brace_pos
-                    end_pos = start_pos
-                    for i in range(start_pos, len(unescaped)):
-                        if unescaped[i] == '{':
-                            brace_count += 1
-                        elif unescaped[i] == '}':
-                            brace_count -= 1
-                            if brace_count == 0:
-                                end_pos = i + 1
-                                break
-                    # Extract the JSON substring
-                    json_str = unescaped[start_pos:end_pos]
-                    try:
-                        # Parse with json.loads
-                        data = json.loads(json_str)
-                        # Verify we got the right data
-                        if 'chartData' in data and 'kpi' in data:
-                            return data
-                    except json.JSONDecodeError as e:
-                        # If json.loads fails, the structure might have some issues
-                        # Print debug info
-                        self.logger.debug(f"JSON decode error: {e}")
-                        self.logger.debug(f"Problematic JSON substring (first 200 chars): {json_str[:200]}")
-                        continue
+        data = {}
+        # Look for the __next_f.push pattern directly in the raw HTML
+        for match in _NEXT_F_RE.finditer(html_data):
+            data, metadata = self._parse_push(match.group(1), data, metadata)
+            if data and not metadata:
+                break
+        if metadata:
+            raise ValueError("Site metadata not found in the fetched page")
+        return data
+
+    def _parse_push(self, escaped_json, data, metadata):
+        """Return the data and metadata still to be found after parsing one push.
+
+        Parameters
+        ----------
+        escaped_json : str
+            Content of a ``self.__next_f.push([1,"..."])`` string, still escaped.
+        data : dict
+            The data found in previous pushes (empty if none yet).
+        metadata : bool
+            True if the site metadata is still to be found; it is then looked
+            for in this push and the associated attributes are set.
+
+        Returns
+        -------
+        dict
+            The data found so far.
+        bool
+            True if the site metadata is still to be found.
+        """
+        # The metadata is escaped JSON, so it can only be in a pushed string
+        if metadata and self._site_metadata(escaped_json) is not None:
+            metadata = False
+        if not data and 'chartData' in escaped_json:
+            data = self._decode_chart_payload(escaped_json)
+        return data, metadata
+
+    def _decode_chart_payload(self, escaped_json):
+        """Return the object holding chartData in a pushed payload, or an empty dict.
+
+        Parameters
+        ----------
+        escaped_json : str
+            Content of a ``self.__next_f.push([1,"..."])`` string, still escaped.
+
+        Returns
+        -------
+        dict
+            The decoded object, or an empty dict if none was found.
+        """
+        # Unescape it: the pushed string is a JSON string literal
+        try:
+            unescaped = _json_loads('"' + escaped_json + '"')
+        except ValueError:
+            # Replace \\" with " and \\\\ with \\ in a single pass
+            unescaped = _UNESCAPE_RE.sub(lambda m: _UNESCAPE_MAP[m.group(0)], escaped_json)
+        # Find the JSON object containing chartData
+        # Look for the pattern: {"params":... ,"chartData":[...], ...}
+        # We need to extract from the first { to its matching }
+        # Find where chartData object starts
+        chart_start = unescaped.find('"chartData"')
+        if chart_start == -1:
+            return {}
+        # Go backwards to find the opening brace of the parent object
+        brace_pos = unescaped.rfind('{', 0, chart_start)
+        if brace_pos == -1:
+            return {}
+        # Decode from the opening brace up to its matching closing brace
+        try:
+            data, _ = _JSON_DECODER.raw_decode(unescaped, brace_pos)
+        except json.JSONDecodeError as e:
+            # If decoding fails, the structure might have some issues
+            # Print debug info
+            self.logger.debug(f"JSON decode error: {e}")
+            self.logger.debug(f"Problematic JSON substring (first 200 chars): {unescaped[brace_pos:brace_pos + 200]}")
+            return {}
+        # Verify we got the right data
+        if 'chartData' in data and 'kpi' in data:
+            return data
         return {}
 
     def _extract_global_counts(self, fetched_data):
@@ -468,12 +643,13 @@ class EcoCounterScraper(object):
         pd.DataFrame
             DataFrame with DateTimeIndex and a single 'count' column.
         """
-        data_table = pd.DataFrame(
-            [(pd.Timestamp(entry['timestamp']).tz_localize(None), 
-              entry['traffic']['counts']) for entry in data_field],
-            columns=['timestamp', 'count'],
-        )
-        return data_table.set_index('timestamp')
+        timestamps = pd.Index([entry['timestamp'] for entry in data_field])
+        counts = [entry['traffic']['counts'] for entry in data_field]
+        # UTC offsets change with DST: drop them to keep local wall-clock times
+        index = pd.to_datetime(timestamps.str.replace(_UTC_OFFSET_RE, '', regex=True),
+                               format='ISO8601')
+        index.name = 'timestamp'
+        return pd.DataFrame({'count': counts}, index=index)
 
     def _extract_directional_counts(self, fetched_data):
         """Return the directional traffic data for each period in a DataFrame
@@ -499,14 +675,13 @@ class EcoCounterScraper(object):
             dir_name = direction_data['direction']
             dir_data.append(self._counts_as_df(direction_data['data']))
             dir_data[-1].rename(columns={'count': dir_name}, inplace=True)
-        # join on timestamp
-        data_table = dir_data[0]
-        for df in dir_data[1:]:
-            data_table = data_table.join(df, how='outer')
-        return data_table
+        if len(dir_data) == 1:
+            return dir_data[0]
+        # align all directions on timestamp at once
+        return pd.concat(dir_data, axis=1, join='outer')
     
     def _site_metadata(self, html_data):
-        """Return site metadata from HTML content and set associated attributes.
+        r"""Return site metadata from HTML content and set associated attributes.
 
         Parameters
         ----------
@@ -515,24 +690,36 @@ class EcoCounterScraper(object):
 
         Returns
         -------
-        dict
+        dict or None
             Dictionary containing site metadata such as site_id, site_name,
-            location (lat, lon), and first_data date.
+            location (lat, lon), and first_data date. None if no metadata
+            was found, in which case attributes are left unchanged.
+
+        Examples
+        --------
+        Characters escaped by NextJS (``&``, ``<``, ``>``...) are kept as is.
+
+        >>> scraper = EcoCounterScraper("300037212")
+        >>> page = (r'self.__next_f.push([1,"{\"currentSite\":{\"id\":300037212,'
+        ...         r'\"name\":\"Cagnes \u0026 Littoral \u003cFR\u003e\",'
+        ...         r'\"location\":{\"lat\":43.66,\"lon\":7.15},'
+        ...         r'\"firstData\":\"2021-01-01T00:00:00+01:00\",')
+        >>> scraper._site_metadata(page)['site_name']
+        'Cagnes \\u0026 Littoral \\u003cFR\\u003e'
+        >>> scraper.site_location_
+        {'lat': 43.66, 'lon': 7.15}
 
         """
-        meta_data_pattern = (r'\\"currentSite\\":{\\"id\\":(?P<site_id>[\d]+),'
-                             r'\\"name\\":\\"(?P<site_name>.*?)\\",'
-                             r'\\"location\\":{\\"lat\\":(?P<lat>[-\d.]+),'
-                             r'\\"lon\\":(?P<lon>[-\d.]+)},'
-                             r'\\"firstData\\":\\"(?P<first_data>.*?)\\",')
-        site_data = re.search(meta_data_pattern, html_data).groupdict()
-        self.site_name_ = site_data['site_name']
+        match = _META_RE.search(html_data)
+        if match is None:
+            return None
+        self.site_name_ = match['site_name']
         self.site_location_ = {
-            'lat': float(site_data['lat']),
-            'lon': float(site_data['lon']),
+            'lat': float(match['lat']),
+            'lon': float(match['lon']),
         }
-        self.site_first_data_ = pd.Timestamp(site_data['first_data']).tz_localize(None)
-        return site_data
+        self.site_first_data_ = pd.Timestamp(match['first_data']).tz_localize(None)
+        return match.groupdict()
         
     def _set_direction_names(self, fetched_data):
         """Return dict matching direction codes to their names.